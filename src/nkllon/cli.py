@@ -5,7 +5,7 @@ import logging
 import sys
 from pathlib import Path
 
-from nkllon import __version__, diff, query, reporters, validate, visualize
+from nkllon import __version__
 from nkllon.config import default_config
 from nkllon.exceptions import (
     ConfigurationError,
@@ -14,6 +14,9 @@ from nkllon.exceptions import (
     ValidationError,
 )
 
+# Subcommand modules are imported inside their handlers: they pull in rdflib,
+# pyshacl and oxrdflib, which `--version`, `--help` and `info` never need.
+
 
 EXIT_CODE_HELP = """\
 Exit codes:
@@ -29,6 +32,15 @@ Exit codes:
 
 def main() -> None:
     """Main CLI entry point."""
+    # Answer trivial invocations before building the full parser tree
+    argv = sys.argv[1:]
+    if argv == ["--version"]:
+        print(f"{Path(sys.argv[0]).name} {__version__}")
+        sys.exit(0)
+    if argv == ["info"]:
+        print_info()
+        return
+
     parser = argparse.ArgumentParser(
         description="NKLLON Hardware Topology Validation System",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -60,6 +72,11 @@ def main() -> None:
         choices=["json", "html", "markdown", "md"],
         help="Report format (overrides --export extension)",
     )
+    validate_parser.add_argument(
+        "--no-inference",
+        action="store_true",
+        help="Skip RDFS inference (faster; constraints must not rely on class hierarchy)",
+    )
     validate_parser.add_argument(
         "--verbose", "-v", action="store_true", help="Enable verbose logging"
     )
@@ -120,11 +137,11 @@ def main() -> None:
     args = parser.parse_args()
 
     if args.command == "validate":
-        handle_validate(args)
+        sys.exit(handle_validate(args))
     elif args.command == "query":
         handle_query(args)
     elif args.command == "diff":
-        handle_diff(args)
+        sys.exit(handle_diff(args))
     elif args.command == "visualize":
         handle_visualize(args)
     elif args.command == "info":
@@ -134,8 +151,21 @@ def main() -> None:
         sys.exit(0)
 
 
-def handle_validate(args: argparse.Namespace) -> None:
-    """Handle validate command."""
+def handle_validate(args: argparse.Namespace) -> int:
+    """
+    Handle validate command.
+
+    Returns the exit code instead of exiting, so validation can be driven
+    in-process (for example over several environments) with shared caches.
+
+    Args:
+        args: Parsed ``validate`` subcommand arguments
+
+    Returns:
+        Process exit code (see ``EXIT_CODE_HELP``)
+    """
+    from nkllon import reporters, validate
+
     logger = logging.getLogger("nkllon")
 
     # Configure logging
@@ -162,6 +192,7 @@ def handle_validate(args: argparse.Namespace) -> None:
             config.ontology_path,
             config.shacl_path,
             data_path,
+            inference="none" if args.no_inference else "rdfs",
         )
 
         # Export report if requested
@@ -185,57 +216,61 @@ def handle_validate(args: argparse.Namespace) -> None:
                 print("  ✓ Rule 3: Bidirectional cables (USB-C to DisplayPort)")
                 print("  ✓ Rule 4: Production uptime-critical ports")
                 print("\n" + "=" * 80)
-            sys.exit(0)
+            return 0
         else:
             if not args.quiet:
                 print("\n❌ VALIDATION FAILED")
                 print("\nViolations found:\n")
                 print(report)
                 print("\n" + "=" * 80)
-            sys.exit(1)
+            return 1
 
     except NKLLONFileNotFoundError as e:
         logger.error("File not found: %s", e)
         if not args.quiet:
             print(f"\n❌ ERROR: {e}")
-        sys.exit(2)
+        return 2
     except ParseError as e:
         logger.error("Parsing error: %s", e)
         if not args.quiet:
             print(f"\n❌ ERROR: {e}")
-        sys.exit(3)
+        return 3
     except ValidationError as e:
         logger.error("Validation execution error: %s", e)
         if not args.quiet:
             print(f"\n❌ ERROR: {e}")
-        sys.exit(4)
+        return 4
     except ConfigurationError as e:
         logger.error("Configuration error: %s", e)
         if not args.quiet:
             print(f"\n❌ ERROR: {e}")
-        sys.exit(5)
+        return 5
     except Exception as e:  # pragma: no cover - safety net
         logger.exception("Unexpected error during validation")
         if not args.quiet:
             print(f"\n❌ UNEXPECTED ERROR: {e}")
-        sys.exit(99)
+        return 99
 
 
 def handle_query(args: argparse.Namespace) -> None:
     """Handle query command."""
+    from nkllon import query
+
     # Set environment if needed (future enhancement)
     query.main()
 
 
-def handle_diff(args: argparse.Namespace) -> None:
-    """Handle diff command."""
+def handle_diff(args: argparse.Namespace) -> int:
+    """Handle diff command and return the exit code."""
+    from nkllon import diff
+
     if not args.file1.exists():
         print(f"Error: File not found: {args.file1}")
-        sys.exit(1)
+        return 1
 
     if not args.file2.exists():
         print(f"Error: File not found: {args.file2}")
-        sys.exit(1)
+        return 1
 
     if args.devices_only:
         changes = diff.get_device_changes(args.file1, args.file2)
@@ -246,13 +281,11 @@ def handle_diff(args: argparse.Namespace) -> None:
 
         if changes["added"]:
             print("\n➕ Added Devices:")
-            for device in changes["added"]:
-                print(f"  + {device['device']} ({device['type']})")
+            print("\n".join(f"  + {d['device']} ({d['type']})" for d in changes["added"]))
 
         if changes["removed"]:
             print("\n➖ Removed Devices:")
-            for device in changes["removed"]:
-                print(f"  - {device['device']} ({device['type']})")
+            print("\n".join(f"  - {d['device']} ({d['type']})" for d in changes["removed"]))
 
         if changes["common"]:
             print(f"\n✓ Unchanged Devices: {len(changes['common'])}")
@@ -261,9 +294,13 @@ def handle_diff(args: argparse.Namespace) -> None:
     else:
         diff.print_topology_diff(args.file1, args.file2)
 
+    return 0
+
 
 def handle_visualize(args: argparse.Namespace) -> None:
     """Handle visualize command."""
+    from nkllon import visualize
+
     config = default_config
     data_path = config.get_deployment_path(args.env)
 
@@ -272,28 +309,31 @@ def handle_visualize(args: argparse.Namespace) -> None:
 
 def print_info() -> None:
     """Print system information."""
-    print("=" * 80)
-    print("NKLLON Hardware Topology System")
-    print("=" * 80)
-    print(f"\nVersion: {__version__}")
-    print("\nDescription:")
-    print("  Semantic web validation system for KVM hardware topologies")
-    print("  using RDF/OWL ontologies and SHACL constraints.")
-    print("\nCommands:")
-    print("  nkllon validate     - Run SHACL validation")
-    print("  nkllon query        - Run example SPARQL queries")
-    print("  nkllon diff         - Compare two topologies")
-    print("  nkllon visualize    - Generate interactive visualization")
-    print("  nkllon info         - Display this information")
-    print("\nMakefile shortcuts:")
-    print("  make validate       - Run validation")
-    print("  make query          - Run queries")
-    print("  make test           - Run test suite")
-    print("\nExamples:")
-    print("  nkllon validate --env prod --export report.html")
-    print("  nkllon diff data/old.ttl data/new.ttl --devices-only")
-    print("  nkllon visualize --output topology.html")
-    print("=" * 80)
+    lines = [
+        "=" * 80,
+        "NKLLON Hardware Topology System",
+        "=" * 80,
+        f"\nVersion: {__version__}",
+        "\nDescription:",
+        "  Semantic web validation system for KVM hardware topologies",
+        "  using RDF/OWL ontologies and SHACL constraints.",
+        "\nCommands:",
+        "  nkllon validate     - Run SHACL validation",
+        "  nkllon query        - Run example SPARQL queries",
+        "  nkllon diff         - Compare two topologies",
+        "  nkllon visualize    - Generate interactive visualization",
+        "  nkllon info         - Display this information",
+        "\nMakefile shortcuts:",
+        "  make validate       - Run validation",
+        "  make query          - Run queries",
+        "  make test           - Run test suite",
+        "\nExamples:",
+        "  nkllon validate --env prod --export report.html",
+        "  nkllon diff data/old.ttl data/new.ttl --devices-only",
+        "  nkllon visualize --output topology.html",
+        "=" * 80,
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 if __name__ == "__main__":
@@ -1,8 +1,12 @@
 """Configuration management for NKLLON topology system."""
 
 import os
+from functools import cached_property
 from pathlib import Path
 
+# Project root inferred from the package location, computed once at import
+_PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
 
 class Config:
     """Configuration for NKLLON topology system."""
@@ -17,7 +21,7 @@ class Config:
         """
         if project_root is None:
             # Infer from package location
-            self.project_root = Path(__file__).parent.parent.parent
+            self.project_root = _PROJECT_ROOT
         else:
             self.project_root = project_root
 
@@ -26,6 +30,9 @@ class Config:
         if env_root:
             self.project_root = Path(env_root)
 
+        # Resolved deployment paths, keyed by environment name
+        self._deployment_paths: dict[str, Path] = {}
+
     @property
     def ontology_dir(self) -> Path:
         """Get ontology directory path."""
@@ -36,17 +43,17 @@ class Config:
         """Get data directory path."""
         return self.project_root / "data"
 
-    @property
+    @cached_property
     def ontology_path(self) -> Path:
         """Get hardware ontology file path."""
         return self.ontology_dir / "hardware_ontology.ttl"
 
-    @property
+    @cached_property
     def shacl_path(self) -> Path:
         """Get SHACL constraints file path."""
         return self.ontology_dir / "system_constraints.shacl.ttl"
 
-    @property
+    @cached_property
     def deployment_path(self) -> Path:
         """Get physical deployment file path."""
         return self.data_dir / "physical_deployment.ttl"
@@ -55,20 +62,27 @@ class Config:
         """
         Get deployment file path for specific environment.
 
+        The result is memoized per environment, so the environment file is
+        only checked for existence on the first lookup.
+
         Args:
             environment: Environment name (dev, staging, prod)
 
         Returns:
             Path to deployment file
         """
-        if environment == "prod":
-            return self.deployment_path
-
-        env_file = self.data_dir / "deployments" / f"{environment}.ttl"
-        if env_file.exists():
-            return env_file
-
-        return self.deployment_path
+        path = self._deployment_paths.get(environment)
+        if path is not None:
+            return path
+
+        path = self.deployment_path
+        if environment != "prod":
+            env_file = self.data_dir / "deployments" / f"{environment}.ttl"
+            if env_file.exists():
+                path = env_file
+
+        self._deployment_paths[environment] = path
+        return path
 
 
 # Global default config
@@ -1,9 +1,88 @@
 """Topology comparison utilities."""
 
+import sys
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+from heapq import nsmallest
+from itertools import chain
 from pathlib import Path
 
-from rdflib import Graph
+from rdflib import RDF, RDFS, BNode, Graph
 from rdflib.compare import graph_diff, to_isomorphic
+from rdflib.term import Node
+
+from nkllon.parsing import iter_turtle
+from nkllon.terms import local_name, typed_devices
+
+Triple = tuple[Node, Node, Node]
+
+
+def _load_topology(topology_path: Path) -> Graph:
+    """Parse a topology Turtle file into an Oxigraph-backed graph."""
+    graph = Graph(store="Oxigraph")
+    graph.parse(topology_path, format="ox-turtle")
+    return graph
+
+
+def _load_device_triples(topology_path: Path) -> Graph:
+    """
+    Parse only the rdf:type and rdfs:subClassOf triples of a topology file.
+
+    oxigraph's parser still reads the whole file, but only the triples that
+    device detection needs are inserted into the graph.
+    """
+    graph = Graph()
+    graph.addN(
+        (s, p, o, graph) for s, p, o in iter_turtle(topology_path, (RDF.type, RDFS.subClassOf))
+    )
+    return graph
+
+
+def _load_topologies(
+    topology1_path: Path,
+    topology2_path: Path,
+    loader: Callable[[Path], Graph] = _load_topology,
+) -> tuple[Graph, Graph]:
+    """Parse two topology files concurrently."""
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        future1 = executor.submit(loader, topology1_path)
+        future2 = executor.submit(loader, topology2_path)
+        return future1.result(), future2.result()
+
+
+def _quick_hash(graph: Graph) -> set[Triple] | None:
+    """
+    Relabel blank nodes by a digest of their outgoing (predicate, object) pairs.
+
+    This is a single-pass substitute for full canonicalization that works when
+    every blank node is a leaf description, such as ``:A :hasPort [ ... ]``.
+    Returns None when it cannot tell blank nodes apart: when one points at
+    another blank node, or when two have identical descriptions.
+
+    Args:
+        graph: Graph to relabel
+
+    Returns:
+        Triples with content-derived blank node labels, or None
+    """
+    labels: dict[Node, Node] = {}
+    for triple in graph:
+        for node in (triple[0], triple[2]):
+            if not isinstance(node, BNode) or node in labels:
+                continue
+            pairs = []
+            for _, predicate, obj in graph.triples((node, None, None)):
+                if isinstance(obj, BNode):
+                    return None
+                pairs.append(f"{predicate.n3()} {obj.n3()}")
+            digest = sha256("\n".join(sorted(pairs)).encode()).hexdigest()
+            labels[node] = BNode(digest)
+
+    if len(set(labels.values())) != len(labels):
+        return None
+
+    return {(labels.get(s, s), p, labels.get(o, o)) for s, p, o in graph}
 
 
 def compare_topologies(topology1_path: Path, topology2_path: Path) -> tuple[set, set, set]:
@@ -17,17 +96,23 @@ def compare_topologies(topology1_path: Path, topology2_path: Path) -> tuple[set,
     Returns:
         Tuple of (in_both, only_in_first, only_in_second)
     """
-    graph1 = Graph()
-    graph1.parse(topology1_path, format="turtle")
+    graph1, graph2 = _load_topologies(topology1_path, topology2_path)
+    triples1 = set(graph1)
+    triples2 = set(graph2)
 
-    graph2 = Graph()
-    graph2.parse(topology2_path, format="turtle")
+    # Without blank nodes, triples compare by value and plain set algebra is exact;
+    # only bnode labels need canonicalizing before they can be matched across files
+    if any(isinstance(node, BNode) for node in chain.from_iterable(triples1 | triples2)):
+        hashed1 = _quick_hash(graph1)
+        hashed2 = _quick_hash(graph2)
+        if hashed1 is None or hashed2 is None:
+            in_both, only_in_first, only_in_second = graph_diff(
+                to_isomorphic(graph1), to_isomorphic(graph2)
+            )
+            return set(in_both), set(only_in_first), set(only_in_second)
+        triples1, triples2 = hashed1, hashed2
 
-    in_both, only_in_first, only_in_second = graph_diff(
-        to_isomorphic(graph1), to_isomorphic(graph2)
-    )
-
-    return in_both, only_in_first, only_in_second  # type: ignore
+    return triples1 & triples2, triples1 - triples2, triples2 - triples1
 
 
 def format_triple(triple: tuple) -> str:
@@ -41,16 +126,7 @@ def format_triple(triple: tuple) -> str:
         Formatted string
     """
     subject, predicate, object = triple
-
-    def format_node(node: object) -> str:  # type: ignore
-        s = str(node)
-        if "#" in s:
-            return s.split("#")[-1]
-        elif "/" in s:
-            return s.split("/")[-1]
-        return s
-
-    return f"{format_node(subject)} → {format_node(predicate)} → {format_node(object)}"
+    return f"{local_name(subject)} → {local_name(predicate)} → {local_name(object)}"
 
 
 def print_topology_diff(topology1_path: Path, topology2_path: Path) -> None:
@@ -63,32 +139,41 @@ def print_topology_diff(topology1_path: Path, topology2_path: Path) -> None:
     """
     in_both, only_in_first, only_in_second = compare_topologies(topology1_path, topology2_path)
 
-    print("=" * 80)
-    print("Topology Comparison")
-    print("=" * 80)
-    print(f"\nFile 1: {topology1_path.name}")
-    print(f"File 2: {topology2_path.name}")
+    lines: list[str] = []
+    lines.append("=" * 80)
+    lines.append("Topology Comparison")
+    lines.append("=" * 80)
+    lines.append(f"\nFile 1: {topology1_path.name}")
+    lines.append(f"File 2: {topology2_path.name}")
 
-    print("\n📊 Statistics:")
-    print(f"  Common triples:     {len(in_both)}")
-    print(f"  Only in {topology1_path.name:20s}: {len(only_in_first)}")
-    print(f"  Only in {topology2_path.name:20s}: {len(only_in_second)}")
+    lines.append("\n📊 Statistics:")
+    lines.append(f"  Common triples:     {len(in_both)}")
+    lines.append(f"  Only in {topology1_path.name:20s}: {len(only_in_first)}")
+    lines.append(f"  Only in {topology2_path.name:20s}: {len(only_in_second)}")
 
     if only_in_first:
-        print(f"\n➖ Removed in {topology2_path.name}:")
-        for triple in sorted(only_in_first)[:20]:  # Show first 20
-            print(f"  - {format_triple(triple)}")
+        lines.append(f"\n➖ Removed in {topology2_path.name}:")
+        for triple in nsmallest(20, only_in_first):  # Show first 20
+            lines.append(f"  - {format_triple(triple)}")
         if len(only_in_first) > 20:
-            print(f"  ... and {len(only_in_first) - 20} more")
+            lines.append(f"  ... and {len(only_in_first) - 20} more")
 
     if only_in_second:
-        print(f"\n➕ Added in {topology2_path.name}:")
-        for triple in sorted(only_in_second)[:20]:  # Show first 20
-            print(f"  + {format_triple(triple)}")
+        lines.append(f"\n➕ Added in {topology2_path.name}:")
+        for triple in nsmallest(20, only_in_second):  # Show first 20
+            lines.append(f"  + {format_triple(triple)}")
         if len(only_in_second) > 20:
-            print(f"  ... and {len(only_in_second) - 20} more")
+            lines.append(f"  ... and {len(only_in_second) - 20} more")
+
+    lines.append("\n" + "=" * 80)
 
-    print("\n" + "=" * 80)
+    # One write for the whole report instead of one per line
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+def _format_device(device: Node, type_: Node) -> dict[str, str]:
+    """Format a (device, type) pair as local names."""
+    return {"device": local_name(str(device)), "type": local_name(str(type_))}
 
 
 def get_device_changes(topology1_path: Path, topology2_path: Path) -> dict:
@@ -102,35 +187,20 @@ def get_device_changes(topology1_path: Path, topology2_path: Path) -> dict:
     Returns:
         Dictionary with added, removed, and modified devices
     """
-    graph1 = Graph()
-    graph1.parse(topology1_path, format="turtle")
-
-    graph2 = Graph()
-    graph2.parse(topology2_path, format="turtle")
-
-    # Query for devices in each graph
-    device_query = """
-        PREFIX : <http://nkllon.com/sys#>
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-
-        SELECT ?device ?type WHERE {
-            ?device a ?type .
-            ?type rdfs:subClassOf* :Device .
-            FILTER(?type != :Device)
-        }
-    """
+    graph1, graph2 = _load_topologies(topology1_path, topology2_path, _load_device_triples)
 
-    devices1 = {(str(row.device), str(row.type)) for row in graph1.query(device_query)}  # type: ignore
-    devices2 = {(str(row.device), str(row.type)) for row in graph2.query(device_query)}  # type: ignore
+    # Set algebra runs on the rdflib terms; they are only formatted for the result
+    devices1 = set(typed_devices(graph1))
+    devices2 = set(typed_devices(graph2))
 
     added = devices2 - devices1
     removed = devices1 - devices2
     common = devices1 & devices2
 
     return {
-        "added": [{"device": d.split("#")[-1], "type": t.split("#")[-1]} for d, t in added],
-        "removed": [{"device": d.split("#")[-1], "type": t.split("#")[-1]} for d, t in removed],
-        "common": [{"device": d.split("#")[-1], "type": t.split("#")[-1]} for d, t in common],
+        "added": [_format_device(device, type_) for device, type_ in added],
+        "removed": [_format_device(device, type_) for device, type_ in removed],
+        "common": [_format_device(device, type_) for device, type_ in common],
     }
 
 
@@ -166,13 +236,11 @@ def main() -> None:
 
         if changes["added"]:
             print("\n➕ Added Devices:")
-            for device in changes["added"]:
-                print(f"  + {device['device']} ({device['type']})")
+            print("\n".join(f"  + {d['device']} ({d['type']})" for d in changes["added"]))
 
         if changes["removed"]:
             print("\n➖ Removed Devices:")
-            for device in changes["removed"]:
-                print(f"  - {device['device']} ({device['type']})")
+            print("\n".join(f"  - {d['device']} ({d['type']})" for d in changes["removed"]))
 
         if changes["common"]:
             print(f"\n✓ Unchanged Devices: {len(changes['common'])}")
@@ -0,0 +1,125 @@
+"""Turtle parsing backed by oxigraph's native parser."""
+
+from collections.abc import Collection, Iterator
+from pathlib import Path
+
+import pyoxigraph as ox
+from rdflib import XSD, BNode, Graph, Literal, URIRef
+from rdflib.term import Node
+
+_XSD_STRING = ox.NamedNode(str(XSD.string))
+
+
+def from_oxigraph(term: ox.NamedNode | ox.BlankNode | ox.Literal) -> Node:
+    """
+    Convert a pyoxigraph term to its rdflib equivalent.
+
+    oxigraph reports plain literals with an explicit ``xsd:string`` datatype;
+    they are returned as untyped literals, matching rdflib's own parser, so
+    SPARQL comparisons against plain string constants keep matching.
+
+    Args:
+        term: Subject or object term produced by pyoxigraph
+
+    Returns:
+        Equivalent rdflib term
+    """
+    if isinstance(term, ox.NamedNode):
+        return URIRef(term.value)
+    if isinstance(term, ox.BlankNode):
+        return BNode(term.value)
+    if term.language:
+        return Literal(term.value, lang=term.language)
+    if term.datatype == _XSD_STRING:
+        return Literal(term.value)
+    return Literal(term.value, datatype=URIRef(term.datatype.value))
+
+
+def to_oxigraph(term: Node) -> ox.NamedNode | ox.BlankNode | ox.Literal:
+    """
+    Convert an rdflib term to its pyoxigraph equivalent.
+
+    Args:
+        term: rdflib URI, blank node or literal
+
+    Returns:
+        Equivalent pyoxigraph term
+
+    Raises:
+        TypeError: If the term has no pyoxigraph counterpart (e.g. a variable)
+    """
+    if isinstance(term, URIRef):
+        return ox.NamedNode(term)
+    if isinstance(term, BNode):
+        return ox.BlankNode(term)
+    if isinstance(term, Literal):
+        if term.language:
+            return ox.Literal(term, language=term.language)
+        if term.datatype:
+            return ox.Literal(term, datatype=ox.NamedNode(term.datatype))
+        return ox.Literal(term)
+    raise TypeError(f"Cannot convert {term!r} to an oxigraph term")
+
+
+def iter_turtle(
+    file_path: Path,
+    predicates: Collection[URIRef] | None = None,
+    prefixes: dict[str, str] | None = None,
+) -> Iterator[tuple[Node, URIRef, Node]]:
+    """
+    Stream the triples of a Turtle file as rdflib terms, parsed by oxigraph.
+
+    Args:
+        file_path: Path to the Turtle file
+        predicates: Only yield triples with one of these predicates (all if None)
+        prefixes: If given, filled with the file's prefix declarations once
+            the iterator is exhausted
+
+    Yields:
+        (subject, predicate, object) triples
+
+    Raises:
+        SyntaxError: If the file is not valid Turtle
+    """
+    parser = ox.parse(
+        path=file_path,
+        format=ox.RdfFormat.TURTLE,
+        base_iri=file_path.resolve().as_uri(),
+        # Scope blank node labels to this document, as rdflib's parser does, so
+        # merging two parsed files never fuses unrelated blank nodes
+        rename_blank_nodes=True,
+    )
+    wanted = None if predicates is None else {ox.NamedNode(p) for p in predicates}
+    for quad in parser:
+        if wanted is None or quad.predicate in wanted:
+            yield (
+                from_oxigraph(quad.subject),
+                URIRef(quad.predicate.value),
+                from_oxigraph(quad.object),
+            )
+    if prefixes is not None:
+        prefixes.update(parser.prefixes)
+
+
+def parse_turtle(file_path: Path, graph: Graph) -> Graph:
+    """
+    Parse a Turtle file into an rdflib graph using oxigraph's parser.
+
+    Triples are streamed straight into the graph's store and the file's
+    prefixes are bound afterwards, like ``graph.parse(file_path, format="turtle")``.
+
+    Args:
+        file_path: Path to the Turtle file
+        graph: Graph to add the parsed triples to
+
+    Returns:
+        The graph passed in
+
+    Raises:
+        SyntaxError: If the file is not valid Turtle
+    """
+    prefixes: dict[str, str] = {}
+    graph.addN((s, p, o, graph) for s, p, o in iter_turtle(file_path, prefixes=prefixes))
+    for prefix, namespace in prefixes.items():
+        graph.bind(prefix, namespace)
+    return graph
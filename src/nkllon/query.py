@@ -1,104 +1,155 @@
 """SPARQL query utilities for hardware topology."""
 
+from functools import cache, lru_cache
 from pathlib import Path
 
+from oxrdflib import OxigraphStore
 from rdflib import Graph
+from rdflib.plugins.sparql import prepareQuery
+from rdflib.plugins.sparql.sparql import Query
 from rdflib.query import ResultRow
 
-
-def load_merged_graph() -> Graph:
-    """Load and merge ontology and deployment data."""
-    project_root = Path(__file__).parent.parent.parent
-
-    graph = Graph()
-    graph.parse(project_root / "ontology" / "hardware_ontology.ttl", format="turtle")
-    graph.parse(project_root / "data" / "physical_deployment.ttl", format="turtle")
+from nkllon.config import default_config
+from nkllon.terms import local_name
+
+BIDIRECTIONAL_CABLES_QUERY = """
+    PREFIX : <http://nkllon.com/sys#>
+
+    SELECT ?cable ?srcDevice ?dstDevice ?srcForm ?dstForm WHERE {
+        ?cable a :Cable ;
+               :isBidirectional true .
+        ?srcPort :connectsVia ?cable .
+        ?cable :connectsTo ?dstPort .
+        ?srcPort :belongsToDevice ?srcDevice ;
+                 :physicalForm ?srcForm .
+        ?dstPort :belongsToDevice ?dstDevice ;
+                 :physicalForm ?dstForm .
+    }
+"""
+
+AUDIO_CONNECTIONS_QUERY = """
+    PREFIX : <http://nkllon.com/sys#>
+
+    SELECT ?audioDevice ?cable ?connectedDevice WHERE {
+        ?audioDevice a :AudioInterface ;
+                     :hasPort ?port .
+        ?port :connectsVia ?cable .
+        ?cable :connectsTo ?otherPort .
+        ?otherPort :belongsToDevice ?connectedDevice .
+    }
+"""
+
+UPTIME_CRITICAL_HOSTS_QUERY = """
+    PREFIX : <http://nkllon.com/sys#>
+
+    SELECT ?host ?kvmPort ?priority WHERE {
+        ?host :isUptimeCritical true ;
+              :hasPort ?hostPort .
+        ?hostPort :connectsVia ?cable .
+        ?cable :connectsTo ?kvmPort .
+        ?kvmPort :portPriority ?priority .
+    }
+"""
+
+ALL_DEVICES_QUERY = """
+    PREFIX : <http://nkllon.com/sys#>
+    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+
+    SELECT ?device ?type WHERE {
+        ?device a ?type .
+        ?type a <http://www.w3.org/2002/07/owl#Class> .
+        FILTER(?type != <http://nkllon.com/sys#Device>)
+    }
+    ORDER BY ?type ?device
+"""
+
+
+@lru_cache(maxsize=1)
+def _load_merged_graph_cached(
+    ontology_path: Path,
+    ontology_stat: tuple[int, int],
+    data_path: Path,
+    data_stat: tuple[int, int],
+) -> Graph:
+    """Parse ontology and deployment data; paths and (mtime_ns, size) pairs are the cache key."""
+    graph = Graph(store="Oxigraph")
+    graph.parse(ontology_path, format="ox-turtle")
+    graph.parse(data_path, format="ox-turtle")
 
     return graph
 
 
-def query_bidirectional_cables() -> list[ResultRow]:
-    """Find all bidirectional cables and their connections."""
-    graph = load_merged_graph()
-
-    query = """
-        PREFIX : <http://nkllon.com/sys#>
-
-        SELECT ?cable ?srcDevice ?dstDevice ?srcForm ?dstForm WHERE {
-            ?cable a :Cable ;
-                   :isBidirectional true .
-            ?srcPort :connectsVia ?cable .
-            ?cable :connectsTo ?dstPort .
-            ?srcPort :belongsToDevice ?srcDevice ;
-                     :physicalForm ?srcForm .
-            ?dstPort :belongsToDevice ?dstDevice ;
-                     :physicalForm ?dstForm .
-        }
+def load_merged_graph() -> Graph:
     """
+    Load and merge ontology and deployment data.
 
-    return list(graph.query(query))
+    The merged graph is cached and shared between callers until either file's
+    mtime or size changes, so it must be treated as read-only.
+    """
+    ontology_path = default_config.ontology_path
+    data_path = default_config.deployment_path
+    ontology_stat = ontology_path.stat()
+    data_stat = data_path.stat()
+    return _load_merged_graph_cached(
+        ontology_path,
+        (ontology_stat.st_mtime_ns, ontology_stat.st_size),
+        data_path,
+        (data_stat.st_mtime_ns, data_stat.st_size),
+    )
 
 
-def query_audio_connections() -> list[ResultRow]:
-    """Find all audio interface connections."""
-    graph = load_merged_graph()
+@cache
+def _prepared(query: str) -> Query:
+    """Parse and translate a query to SPARQL algebra, once per query text."""
+    return prepareQuery(query)
 
-    query = """
-        PREFIX : <http://nkllon.com/sys#>
 
-        SELECT ?audioDevice ?cable ?connectedDevice WHERE {
-            ?audioDevice a :AudioInterface ;
-                         :hasPort ?port .
-            ?port :connectsVia ?cable .
-            ?cable :connectsTo ?otherPort .
-            ?otherPort :belongsToDevice ?connectedDevice .
-        }
+def _run_query(graph: Graph, query: str) -> list[ResultRow]:
     """
+    Run a SELECT query, reusing its prepared form on rdflib-native stores.
 
-    return list(graph.query(query))
-
+    Queries are only prepared on first use there, so the default Oxigraph path
+    never pays for the rdflib parse.
 
-def query_uptime_critical_hosts() -> list[ResultRow]:
-    """Find uptime-critical hosts and their KVM port priorities."""
-    graph = load_merged_graph()
+    Oxigraph compiles SPARQL text natively and rejects prepared queries, which
+    would make rdflib fall back to its slower Python engine, so Oxigraph-backed
+    graphs get the query text instead.
+    """
+    if isinstance(graph.store, OxigraphStore):
+        return list(graph.query(query))  # type: ignore
+    return list(graph.query(_prepared(query)))  # type: ignore
 
-    query = """
-        PREFIX : <http://nkllon.com/sys#>
 
-        SELECT ?host ?kvmPort ?priority WHERE {
-            ?host :isUptimeCritical true ;
-                  :hasPort ?hostPort .
-            ?hostPort :connectsVia ?cable .
-            ?cable :connectsTo ?kvmPort .
-            ?kvmPort :portPriority ?priority .
-        }
-    """
+def query_bidirectional_cables(graph: Graph | None = None) -> list[ResultRow]:
+    """Find all bidirectional cables and their connections."""
+    if graph is None:
+        graph = load_merged_graph()
+    return _run_query(graph, BIDIRECTIONAL_CABLES_QUERY)
 
-    return list(graph.query(query))
 
+def query_audio_connections(graph: Graph | None = None) -> list[ResultRow]:
+    """Find all audio interface connections."""
+    if graph is None:
+        graph = load_merged_graph()
+    return _run_query(graph, AUDIO_CONNECTIONS_QUERY)
 
-def query_all_devices() -> list[ResultRow]:
-    """List all devices in the topology."""
-    graph = load_merged_graph()
 
-    query = """
-        PREFIX : <http://nkllon.com/sys#>
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+def query_uptime_critical_hosts(graph: Graph | None = None) -> list[ResultRow]:
+    """Find uptime-critical hosts and their KVM port priorities."""
+    if graph is None:
+        graph = load_merged_graph()
+    return _run_query(graph, UPTIME_CRITICAL_HOSTS_QUERY)
 
-        SELECT ?device ?type WHERE {
-            ?device a ?type .
-            ?type a <http://www.w3.org/2002/07/owl#Class> .
-            FILTER(?type != <http://nkllon.com/sys#Device>)
-        }
-        ORDER BY ?type ?device
-    """
 
-    return list(graph.query(query))
+def query_all_devices(graph: Graph | None = None) -> list[ResultRow]:
+    """List all devices in the topology."""
+    if graph is None:
+        graph = load_merged_graph()
+    return _run_query(graph, ALL_DEVICES_QUERY)
 
 
-def format_uri(uri: str) -> str:
-    """Format URI for display by extracting local name."""
-    return uri.split("#")[-1] if "#" in uri else uri.split("/")[-1]
+# Format URI for display by extracting local name
+format_uri = local_name
 
 
 def main() -> None:
@@ -107,10 +158,12 @@ def main() -> None:
     print("NKLLON Hardware Topology - SPARQL Queries")
     print("=" * 80)
 
+    graph = load_merged_graph()
+
     # Query 1: Bidirectional cables
     print("\n📊 Query 1: Bidirectional Cables")
     print("-" * 80)
-    results = query_bidirectional_cables()
+    results = query_bidirectional_cables(graph)
     if results:
         for row in results:
             cable = format_uri(str(row.cable))
@@ -125,7 +178,7 @@ def main() -> None:
     # Query 2: Audio connections
     print("\n🎵 Query 2: Audio Interface Connections")
     print("-" * 80)
-    results = query_audio_connections()
+    results = query_audio_connections(graph)
     if results:
         for row in results:
             audio = format_uri(str(row.audioDevice))
@@ -138,7 +191,7 @@ def main() -> None:
     # Query 3: Uptime-critical hosts
     print("\n⚡ Query 3: Uptime-Critical Hosts")
     print("-" * 80)
-    results = query_uptime_critical_hosts()
+    results = query_uptime_critical_hosts(graph)
     if results:
         for row in results:
             host = format_uri(str(row.host))
@@ -151,7 +204,7 @@ def main() -> None:
     # Query 4: All devices
     print("\n🖥️  Query 4: All Devices")
     print("-" * 80)
-    results = query_all_devices()
+    results = query_all_devices(graph)
     if results:
         current_type = None
         for row in results:
@@ -0,0 +1,47 @@
+"""Shared NKLLON vocabulary and graph term helpers."""
+
+from collections.abc import Iterator
+from functools import lru_cache
+
+from rdflib import RDF, RDFS, Graph, Namespace
+from rdflib.term import Node
+
+NS = Namespace("http://nkllon.com/sys#")
+
+
+@lru_cache(maxsize=4096)
+def local_name(uri: str) -> str:
+    """
+    Return the local name of a URI, for display.
+
+    Args:
+        uri: URI (or any rdflib term) to shorten
+
+    Returns:
+        The part after the last ``#``, else after the last ``/``
+    """
+    _, sep, tail = uri.rpartition("#")
+    if sep:
+        return tail
+    return uri.rpartition("/")[2]
+
+
+def typed_devices(graph: Graph) -> Iterator[tuple[Node, Node]]:
+    """
+    Yield (device, type) pairs for instances of :Device subclasses.
+
+    Equivalent to ``?device a ?type . ?type rdfs:subClassOf* :Device`` with
+    ``:Device`` itself excluded, but the subclass closure is computed once
+    instead of being expanded by the SPARQL engine for every row.
+
+    Args:
+        graph: Graph holding the class hierarchy and the typed devices
+
+    Yields:
+        (device, type) pairs
+    """
+    device_types = set(graph.transitive_subjects(RDFS.subClassOf, NS.Device))
+    device_types.discard(NS.Device)
+    for device, _, type_ in graph.triples((None, RDF.type, None)):
+        if type_ in device_types:
+            yield device, type_
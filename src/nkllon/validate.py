@@ -1,16 +1,34 @@
 """SHACL validation for hardware topology."""
 
 import logging
+import os
+import re
 import sys
+import threading
+from collections.abc import Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
+from typing import Any
 
+import owlrl
+import pyoxigraph as ox
 from pyshacl import validate
-from rdflib import Graph
-from rdflib.exceptions import ParserError
+from pyshacl.inference import CustomRDFSSemantics
+from rdflib import OWL, RDF, RDFS, SH, Graph, Literal, plugin
+from rdflib.plugins.sparql.algebra import translateQuery
+from rdflib.plugins.sparql.parser import parseQuery
+from rdflib.plugins.sparql.processor import SPARQLProcessor
+from rdflib.plugins.sparql.sparql import Query
+from rdflib.query import Processor
+from rdflib.term import Node
 
 from nkllon.config import Config, default_config
 from nkllon.exceptions import FileNotFoundError as NKLLONFileNotFoundError
 from nkllon.exceptions import ParseError, ValidationError
+from nkllon.parsing import from_oxigraph, parse_turtle, to_oxigraph
 
 # Configure logging
 logging.basicConfig(
@@ -20,15 +38,117 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def load_graph(file_path: Path) -> Graph:
+@lru_cache(maxsize=256)
+def _compile_query(query: str, base: str | None, namespaces: frozenset[tuple[str, Any]]) -> Query:
+    """Parse and translate a SPARQL query string to algebra, memoized on its text."""
+    return translateQuery(parseQuery(query), base, dict(namespaces))
+
+
+class _CachingSPARQLProcessor(SPARQLProcessor):
     """
-    Load an RDF graph from a Turtle file.
+    rdflib SPARQL processor that reuses compiled query algebra.
+
+    pyshacl evaluates each ``sh:sparql`` constraint by passing its query text
+    to ``Graph.query`` once per focus node, and parsing that text dominates
+    validation time. Installed as rdflib's ``sparql`` processor while pyshacl
+    runs (see ``_caching_sparql_processor``) so each constraint is parsed once
+    per process instead of once per node.
+    """
+
+    def query(  # type: ignore[override]
+        self,
+        strOrQuery: str | Query,
+        initBindings: Mapping[str, Any] | None = None,
+        initNs: Mapping[str, Any] | None = None,
+        base: str | None = None,
+        DEBUG: bool = False,
+    ) -> Mapping[str, Any]:
+        if isinstance(strOrQuery, str):
+            strOrQuery = _compile_query(strOrQuery, base, frozenset((initNs or {}).items()))
+        return super().query(strOrQuery, initBindings, initNs, base, DEBUG)
+
+
+# Number of validations currently relying on the override, and the processor
+# plugin (module path, class name) to restore once none are left
+_processor_lock = threading.Lock()
+_processor_users = 0
+_previous_processor: tuple[str, str] | None = None
+
+
+@contextmanager
+def _caching_sparql_processor() -> Iterator[None]:
+    """
+    Route rdflib's ``sparql`` query processor through ``_CachingSPARQLProcessor``.
+
+    rdflib looks the processor plugin up on every ``Graph.query`` call, so the
+    override only applies while the context is active, to every rdflib query
+    in the process at that time. The previous processor is restored when the
+    last overlapping validation finishes.
+    """
+    global _processor_users, _previous_processor
+    with _processor_lock:
+        if _processor_users == 0:
+            current = next(plugin.plugins("sparql", Processor))
+            _previous_processor = (current.module_path, current.class_name)
+            plugin.register("sparql", Processor, __name__, "_CachingSPARQLProcessor")
+        _processor_users += 1
+    try:
+        yield
+    finally:
+        with _processor_lock:
+            _processor_users -= 1
+            if _processor_users == 0 and _previous_processor is not None:
+                plugin.register("sparql", Processor, *_previous_processor)
+
+
+@lru_cache(maxsize=16)
+def _load_graph_cached(path_str: str, mtime_ns: int, size: int) -> Graph:
+    """
+    Parse a Turtle file, memoized on its path, modification time and size.
+
+    The ``mtime_ns`` and ``size`` arguments are only part of the cache key: editing
+    the file changes them, so the next lookup misses and the file is parsed again.
+    The returned graph is shared between callers and must not be mutated.
+
+    Args:
+        path_str: Absolute path to the Turtle file
+        mtime_ns: File modification time in nanoseconds
+        size: File size in bytes
+
+    Returns:
+        Parsed RDF graph
+
+    Raises:
+        ParseError: If file has syntax errors
+    """
+    file_path = Path(path_str)
+    # Keep rdflib's in-memory store (pyshacl's SPARQL constraints run on rdflib's
+    # engine) but let oxigraph's native parser do the parsing.
+    graph = Graph()
+    try:
+        parse_turtle(file_path, graph)
+        # len() walks the whole store, so only pay for it when debug logging is on
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Successfully loaded {len(graph)} triples from {file_path.name}")
+    except SyntaxError as e:
+        raise ParseError(f"Syntax error in {file_path.name}: {e}")
+    except Exception as e:
+        raise ParseError(f"Failed to load {file_path.name}: {e}")
+
+    return graph
+
+
+def _load_shared_graph(file_path: Path) -> Graph:
+    """
+    Return the cached graph for a Turtle file without copying it.
+
+    The result is shared with every other caller, so it must not be modified.
 
     Args:
         file_path: Path to the Turtle file
 
     Returns:
-        Loaded RDF graph
+        Cached RDF graph
 
     Raises:
         NKLLONFileNotFoundError: If file doesn't exist
@@ -39,30 +159,275 @@ def load_graph(file_path: Path) -> Graph:
 
     logger.debug(f"Loading graph from {file_path}")
 
+    stat = file_path.stat()
+    return _load_graph_cached(str(file_path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+def load_graph(file_path: Path) -> Graph:
+    """
+    Load an RDF graph from a Turtle file.
+
+    Parsed graphs are cached per process and reused until the file's mtime or
+    size changes. Each call returns a fresh copy, so callers may modify it.
+
+    Args:
+        file_path: Path to the Turtle file
+
+    Returns:
+        Loaded RDF graph
+
+    Raises:
+        NKLLONFileNotFoundError: If file doesn't exist
+        ParseError: If file has syntax errors
+    """
+    cached = _load_shared_graph(file_path)
+
     graph = Graph()
-    try:
-        graph.parse(file_path, format="turtle")
-        logger.debug(f"Successfully loaded {len(graph)} triples from {file_path.name}")
-    except ParserError as e:
-        raise ParseError(f"Syntax error in {file_path.name}: {e}")
-    except Exception as e:
-        raise ParseError(f"Failed to load {file_path.name}: {e}")
+    for prefix, namespace in cached.namespaces():
+        graph.bind(prefix, namespace)
+    graph += cached
 
     return graph
 
 
+# SHACL-AF terms; pyshacl ignores them unless advanced features are enabled
+_ADVANCED_PREDICATES = frozenset({SH.rule, SH.target})
+_ADVANCED_TYPES = frozenset(
+    {
+        SH.SPARQLRule,
+        SH.TripleRule,
+        SH.SPARQLTarget,
+        SH.SPARQLTargetType,
+        SH.SPARQLFunction,
+        SH.Function,
+        SH.JSRule,
+        SH.JSTarget,
+        SH.JSTargetType,
+        SH.JSFunction,
+    }
+)
+
+
+def _uses_advanced_features(shapes: Graph) -> bool:
+    """Check whether a shapes graph declares rules, custom targets or functions."""
+    return any(
+        predicate in _ADVANCED_PREDICATES or (predicate == RDF.type and obj in _ADVANCED_TYPES)
+        for _, predicate, obj in shapes
+    )
+
+
+@lru_cache(maxsize=4)
+def _rdfs_closure(ontology: Graph, data: Graph) -> Graph:
+    """
+    Merge the ontology into the data and expand it with RDFS entailments.
+
+    Keyed on the shared graphs from ``_load_shared_graph``, which are replaced
+    whenever their file changes, so the closure is recomputed only after an
+    edit. The returned graph is shared between callers and must not be mutated.
+
+    Args:
+        ontology: Cached ontology graph
+        data: Cached deployment data graph
+
+    Returns:
+        RDFS closure of the merged graphs
+    """
+    merged = Graph()
+    for graph in (ontology, data):
+        for prefix, namespace in graph.namespaces():
+            merged.bind(prefix, namespace)
+        merged += graph
+    # pyshacl's own RDFS semantics, so the closure matches inference="rdfs"
+    owlrl.DeductiveClosure(CustomRDFSSemantics).expand(merged)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"RDFS closure holds {len(merged)} triples")
+    return merged
+
+
+# SHACL terms the Oxigraph backend understands; shapes using any other
+# sh: predicate or type are validated with pyshacl instead
+_OXIGRAPH_SHACL_PREDICATES = frozenset({SH.targetClass, SH.sparql, SH.select, SH.message})
+_OXIGRAPH_SHACL_TYPES = frozenset({SH.NodeShape, SH.SPARQLConstraint})
+_SHACL_NS = str(SH)
+# A shape that is also a class targets its own instances (implicit class target)
+_IMPLICIT_TARGET_TYPES = (RDFS.Class, OWL.Class)
+
+# SHACL-SPARQL pre-binds these besides $this; the Oxigraph backend does not,
+# so queries referring to them are validated with pyshacl instead
+_UNSUPPORTED_PREBOUND = re.compile(r"[?$](?:currentShape|shapesGraph|PATH)\b")
+
+# SHACL class targets include instances of subclasses
+_FOCUS_NODES_QUERY = """
+    SELECT DISTINCT ?this ?class WHERE {
+        ?this a/<http://www.w3.org/2000/01/rdf-schema#subClassOf>* ?class
+    }
+"""
+
+
+def _sparql_constraints(shapes: Graph) -> list[tuple[Node, Node, str, str]] | None:
+    """
+    Collect the SPARQL-based constraints of a shapes graph.
+
+    Args:
+        shapes: SHACL shapes graph
+
+    Returns:
+        (shape, target class, SELECT query, message) tuples, or None if the
+        shapes use SHACL features other than node shapes with class targets
+        and ``sh:sparql``/``sh:select`` constraints, if a constrained shape
+        is untyped, lacks ``sh:targetClass`` or is itself a class, if a query
+        refers to a pre-bound variable other than ``$this``, or if a message
+        uses ``{...}`` templates
+    """
+    for _, predicate, obj in shapes:
+        if predicate == RDF.type:
+            if str(obj).startswith(_SHACL_NS) and obj not in _OXIGRAPH_SHACL_TYPES:
+                return None
+        elif str(predicate).startswith(_SHACL_NS) and predicate not in _OXIGRAPH_SHACL_PREDICATES:
+            return None
+
+    constraints = []
+    for shape in dict.fromkeys(shapes.subjects(SH.sparql)):
+        targets = list(shapes.objects(shape, SH.targetClass))
+        if (
+            not targets
+            or (shape, RDF.type, SH.NodeShape) not in shapes
+            or any((shape, RDF.type, cls) in shapes for cls in _IMPLICIT_TARGET_TYPES)
+        ):
+            return None
+        for constraint in shapes.objects(shape, SH.sparql):
+            select = shapes.value(constraint, SH.select)
+            if select is None or _UNSUPPORTED_PREBOUND.search(str(select)):
+                return None
+            message = str(shapes.value(constraint, SH.message) or "")
+            if "{" in message:
+                return None
+            for target in targets:
+                constraints.append((shape, target, str(select), message))
+    return constraints
+
+
+@lru_cache(maxsize=4)
+def _oxigraph_store(*graphs: Graph) -> ox.Store:
+    """
+    Copy shared cached graphs into an in-memory Oxigraph store, memoized on the graphs.
+
+    The RDFS closure contains generalized triples with literal subjects, which
+    are not valid RDF and are left out.
+    """
+    store = ox.Store()
+    store.bulk_extend(
+        ox.Quad(to_oxigraph(s), to_oxigraph(p), to_oxigraph(o))  # type: ignore[arg-type]
+        for graph in graphs
+        for s, p, o in graph
+        if not isinstance(s, Literal)
+    )
+    return store
+
+
+def _select(store: ox.Store, query: str, substitutions: dict) -> ox.QuerySolutions:
+    """Run a SELECT query on an Oxigraph store with pre-bound variables."""
+    solutions = store.query(query, substitutions=substitutions)
+    if not isinstance(solutions, ox.QuerySolutions):
+        raise ValidationError(f"Expected a SELECT query: {query.strip()}")
+    return solutions
+
+
+def _find_violations(
+    store: ox.Store, constraints: list[tuple[Node, Node, str, str]]
+) -> Iterator[tuple[Node, Node, Node, str]]:
+    """Yield (shape, focus node, value node, message) for each constraint solution."""
+    this = ox.Variable("this")
+    for shape, target, select, message in constraints:
+        focus_nodes = _select(
+            store, _FOCUS_NODES_QUERY, {ox.Variable("class"): to_oxigraph(target)}
+        )
+        for focus in focus_nodes:
+            for solution in _select(store, select, {this: focus["this"]}):
+                value = solution["value"] or focus["this"]
+                yield shape, from_oxigraph(focus["this"]), from_oxigraph(value), message
+
+
+def _validate_oxigraph(
+    store: ox.Store, shapes: Graph, namespaces: Graph, abort_on_first: bool = False
+) -> tuple[bool, str] | None:
+    """
+    Evaluate SHACL-SPARQL constraints with Oxigraph's native SPARQL engine.
+
+    Each focus node is bound to ``$this`` by query substitution, as SHACL-SPARQL
+    pre-binds it, and every solution is reported as a violation.
+
+    Args:
+        store: Store holding the (expanded) data graph
+        shapes: SHACL shapes graph
+        namespaces: Graph whose prefixes are used to abbreviate report nodes
+        abort_on_first: Stop at the first violation
+
+    Returns:
+        Tuple of (conforms: bool, report: str), or None if the shapes need pyshacl
+    """
+    constraints = _sparql_constraints(shapes)
+    if constraints is None:
+        return None
+
+    found = _find_violations(store, constraints)
+    try:
+        violations = set(islice(found, 1) if abort_on_first else found)
+    except (RuntimeError, SyntaxError) as e:
+        # e.g. a query oxigraph cannot parse, or one that does not project $this
+        logger.debug(f"oxigraph cannot evaluate the SHACL-SPARQL constraints: {e}")
+        return None
+
+    manager = namespaces.namespace_manager
+    lines = ["Validation Report", f"Conforms: {not violations}"]
+    if violations:
+        lines.append(f"Results ({len(violations)}):")
+    for shape, focus, value, message in sorted(violations):
+        lines += [
+            "Constraint Violation in SPARQLConstraintComponent "
+            "(http://www.w3.org/ns/shacl#SPARQLConstraintComponent):",
+            "\tSeverity: sh:Violation",
+            f"\tSource Shape: {shape.n3(shapes.namespace_manager)}",
+            f"\tFocus Node: {focus.n3(manager)}",
+            f"\tValue Node: {value.n3(manager)}",
+            f"\tMessage: {message}",
+        ]
+    return not violations, "\n".join(lines) + "\n"
+
+
 def validate_topology(
     ontology_path: Path,
     shacl_path: Path,
     data_path: Path,
+    inference: str = "rdfs",
+    advanced: bool | None = None,
+    fast: bool = False,
 ) -> tuple[bool, str]:
     """
     Validate hardware topology against SHACL constraints.
 
+    Rules 1-4 match on explicitly asserted types and properties, so they
+    currently hold without inference; re-check that before relying on
+    ``inference="none"`` if a rule starts depending on the class hierarchy.
+
+    SHACL-SPARQL constraints (``sh:sparql``/``sh:select``) do not need SHACL
+    Advanced Features, so by default they are only enabled when the shapes use
+    rules, custom targets or SPARQL functions.
+
+    Setting ``NKLLON_SHACL_BACKEND=oxigraph`` evaluates those constraints with
+    Oxigraph's native SPARQL engine instead of pyshacl, with a shorter report.
+    It falls back to pyshacl for shapes using other SHACL features and for the
+    "owlrl" and "both" inference modes.
+
     Args:
         ontology_path: Path to hardware ontology TTL file
         shacl_path: Path to SHACL constraints TTL file
         data_path: Path to physical deployment data TTL file
+        inference: pyshacl inference mode ("rdfs", "owlrl", "both" or "none")
+        advanced: Enable SHACL Advanced Features (rules, custom targets, functions);
+            detected from the shapes when None
+        fast: Stop at the first violation; the report then describes at most
+            one violation, which is enough when only ``conforms`` matters
 
     Returns:
         Tuple of (conforms: bool, report: str)
@@ -75,30 +440,56 @@ def validate_topology(
     logger.info(f"Starting validation for {data_path.name}")
 
     try:
-        # Load ontology
-        logger.debug("Loading ontology...")
-        ontology = load_graph(ontology_path)
-
-        # Load data and merge with ontology
-        logger.debug("Loading deployment data...")
-        data = load_graph(data_path)
-        data += ontology
-        logger.debug(f"Merged graph contains {len(data)} triples")
-
-        # Load SHACL shapes
-        logger.debug("Loading SHACL constraints...")
-        shapes = load_graph(shacl_path)
+        # Load ontology, deployment data and SHACL shapes concurrently.
+        # The ontology and data are only read (merged into the cached RDFS
+        # closure, or passed to pyshacl, which clones the data before mixing in
+        # ont_graph), so the cached graphs are used as-is; the shapes graph is
+        # copied because pyshacl adds its system triples to it.
+        logger.debug("Loading ontology, deployment data and SHACL constraints...")
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            ontology_future = executor.submit(_load_shared_graph, ontology_path)
+            data_future = executor.submit(_load_shared_graph, data_path)
+            shapes_future = executor.submit(load_graph, shacl_path)
+            ontology = ontology_future.result()
+            data = data_future.result()
+            shapes = shapes_future.result()
+
+        if advanced is None:
+            advanced = _uses_advanced_features(shapes)
+
+        # The RDFS closure only changes when the ontology or data does, so
+        # reuse it and let pyshacl skip its own per-call inference.
+        ont_graph: Graph | None = ontology
+        if inference == "rdfs":
+            data = _rdfs_closure(ontology, data)
+            ont_graph = None
+            inference = "none"
+
+        # Opt-in native backend; shapes or inference modes it cannot handle
+        # still go through pyshacl
+        backend = os.getenv("NKLLON_SHACL_BACKEND", "pyshacl")
+        if backend not in ("pyshacl", "oxigraph"):
+            raise ValidationError(f"Unknown SHACL backend: {backend}")
+        if backend == "oxigraph" and inference == "none":
+            graphs = (data,) if ont_graph is None else (ontology, data)
+            result = _validate_oxigraph(_oxigraph_store(*graphs), shapes, data, fast)
+            if result is not None:
+                logger.info(f"Validation {'passed' if result[0] else 'failed'} (oxigraph)")
+                return result
+            logger.info("Shapes use SHACL features the oxigraph backend lacks; using pyshacl")
 
         # Validate
         logger.info("Running SHACL validation...")
-        conforms, results_graph, results_text = validate(
-            data_graph=data,
-            shacl_graph=shapes,
-            inference="rdfs",
-            abort_on_first=False,
-            meta_shacl=False,
-            advanced=True,
-        )
+        with _caching_sparql_processor():
+            conforms, results_graph, results_text = validate(
+                data_graph=data,
+                shacl_graph=shapes,
+                ont_graph=ont_graph,
+                inference=inference,
+                abort_on_first=fast,
+                meta_shacl=False,
+                advanced=advanced,
+            )
 
         logger.info(f"Validation {'passed' if conforms else 'failed'}")
         return conforms, results_text
@@ -145,6 +536,11 @@ def main() -> None:
         default="prod",
         help="Environment to validate (default: prod)",
     )
+    parser.add_argument(
+        "--no-inference",
+        action="store_true",
+        help="Skip RDFS inference (faster; constraints must not rely on class hierarchy)",
+    )
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
     parser.add_argument("--quiet", "-q", action="store_true", help="Suppress output except errors")
 
@@ -174,6 +570,7 @@ def main() -> None:
             config.ontology_path,
             config.shacl_path,
             data_path,
+            inference="none" if args.no_inference else "rdfs",
         )
 
         if conforms:
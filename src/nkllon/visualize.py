@@ -1,9 +1,24 @@
 """Topology visualization utilities."""
 
 import json
+from collections import defaultdict
+from io import StringIO
 from pathlib import Path
+from typing import TextIO
 
-from rdflib import Graph
+from rdflib import RDFS, Graph, URIRef
+from rdflib.term import Node
+
+from nkllon.parsing import iter_turtle
+from nkllon.terms import NS, local_name, typed_devices
+
+
+def _index(graph: Graph, predicate: URIRef) -> dict[Node, list[Node]]:
+    """Map each subject of ``predicate`` to its objects."""
+    index: defaultdict[Node, list[Node]] = defaultdict(list)
+    for subject, obj in graph.subject_objects(predicate):
+        index[subject].append(obj)
+    return index
 
 
 def extract_topology_graph(graph: Graph) -> tuple[list[dict], list[dict]]:
@@ -16,99 +31,76 @@ def extract_topology_graph(graph: Graph) -> tuple[list[dict], list[dict]]:
     Returns:
         Tuple of (nodes, edges) as lists of dictionaries
     """
-    # Query for devices
-    device_query = """
-        PREFIX : <http://nkllon.com/sys#>
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-
-        SELECT DISTINCT ?device ?type WHERE {
-            ?device a ?type .
-            ?type rdfs:subClassOf* :Device .
-            FILTER(?type != :Device)
-        }
-    """
-
-    # Query for connections
-    connection_query = """
-        PREFIX : <http://nkllon.com/sys#>
-
-        SELECT ?src ?dst ?cable WHERE {
-            ?srcPort :belongsToDevice ?src ;
-                     :connectsVia ?cable .
-            ?cable :connectsTo ?dstPort .
-            ?dstPort :belongsToDevice ?dst .
-        }
-    """
-
     nodes = []
     edges = []
 
-    # Build nodes
-    for row in graph.query(device_query):
-        device_id = str(row.device).split("#")[-1]  # type: ignore
-        device_type = str(row.type).split("#")[-1]  # type: ignore
-        nodes.append({"id": device_id, "type": device_type, "label": device_id})
-
-    # Build edges
-    for row in graph.query(connection_query):
-        src_id = str(row.src).split("#")[-1]  # type: ignore
-        dst_id = str(row.dst).split("#")[-1]  # type: ignore
-        cable_id = str(row.cable).split("#")[-1]  # type: ignore
-        edges.append({"source": src_id, "target": dst_id, "label": cable_id})
+    for device, type_ in typed_devices(graph):
+        device_id = local_name(device)
+        nodes.append({"id": device_id, "type": local_name(type_), "label": device_id})
+
+    # Build edges by joining port -> device, port -> cable and cable -> port
+    # through predicate indexes (srcPort :belongsToDevice ?src ; :connectsVia ?cable .
+    # ?cable :connectsTo ?dstPort . ?dstPort :belongsToDevice ?dst)
+    belongs_to = _index(graph, NS.belongsToDevice)
+    connects_to = _index(graph, NS.connectsTo)
+    for src_port, cable in graph.subject_objects(NS.connectsVia):
+        for src in belongs_to.get(src_port, ()):
+            for dst_port in connects_to.get(cable, ()):
+                for dst in belongs_to.get(dst_port, ()):
+                    edges.append(
+                        {
+                            "source": local_name(src),
+                            "target": local_name(dst),
+                            "label": local_name(cable),
+                        }
+                    )
 
     return nodes, edges
 
 
-def generate_d3_html(nodes: list[dict], edges: list[dict]) -> str:
-    """
-    Generate HTML with D3.js visualization.
+_NODE_FIELDS = ("id", "type", "label")
+_LINK_FIELDS = ("source", "target", "label")
 
-    Args:
-        nodes: List of node dictionaries
-        edges: List of edge dictionaries
-
-    Returns:
-        HTML string with embedded D3.js visualization
-    """
-    return f"""<!DOCTYPE html>
+# D3.js page template, split around the embedded node and link data
+_HTML_HEAD = """<!DOCTYPE html>
 <html>
 <head>
     <meta charset="utf-8">
     <title>NKLLON Topology Visualization</title>
     <script src="https://d3js.org/d3.v7.min.js"></script>
     <style>
-        body {{
+        body {
             margin: 0;
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             overflow: hidden;
-        }}
-        #graph {{
+        }
+        #graph {
             width: 100vw;
             height: 100vh;
             background: #f8f9fa;
-        }}
-        .node {{
+        }
+        .node {
             cursor: pointer;
             stroke: #fff;
             stroke-width: 2px;
-        }}
-        .link {{
+        }
+        .link {
             stroke: #999;
             stroke-opacity: 0.6;
             stroke-width: 2px;
-        }}
-        .node-label {{
+        }
+        .node-label {
             font-size: 12px;
             font-weight: bold;
             pointer-events: none;
             text-shadow: 0 1px 2px rgba(255,255,255,0.8);
-        }}
-        .link-label {{
+        }
+        .link-label {
             font-size: 10px;
             fill: #666;
             pointer-events: none;
-        }}
-        .legend {{
+        }
+        .legend {
             position: absolute;
             top: 20px;
             right: 20px;
@@ -116,19 +108,19 @@ def generate_d3_html(nodes: list[dict], edges: list[dict]) -> str:
             padding: 15px;
             border-radius: 8px;
             box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        }}
-        .legend-item {{
+        }
+        .legend-item {
             display: flex;
             align-items: center;
             margin: 5px 0;
-        }}
-        .legend-color {{
+        }
+        .legend-color {
             width: 20px;
             height: 20px;
             border-radius: 50%;
             margin-right: 10px;
-        }}
-        .controls {{
+        }
+        .controls {
             position: absolute;
             top: 20px;
             left: 20px;
@@ -136,8 +128,8 @@ def generate_d3_html(nodes: list[dict], edges: list[dict]) -> str:
             padding: 15px;
             border-radius: 8px;
             box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        }}
-        button {{
+        }
+        button {
             margin: 5px;
             padding: 8px 16px;
             border: none;
@@ -146,10 +138,10 @@ def generate_d3_html(nodes: list[dict], edges: list[dict]) -> str:
             color: white;
             cursor: pointer;
             font-size: 14px;
-        }}
-        button:hover {{
+        }
+        button:hover {
             background: #5568d3;
-        }}
+        }
     </style>
 </head>
 <body>
@@ -186,8 +178,18 @@ def generate_d3_html(nodes: list[dict], edges: list[dict]) -> str:
     </div>
 
     <script>
-        const nodes = {json.dumps(nodes)};
-        const links = {json.dumps(edges)};
+        const nodeColumns = """
+_HTML_LINKS = """;
+        const linkColumns = """
+_HTML_TAIL = """;
+
+        // Data is embedded column-wise; rebuild one object per node and link
+        const nodes = nodeColumns.id.map((id, i) => ({
+            id, type: nodeColumns.type[i], label: nodeColumns.label[i]
+        }));
+        const links = linkColumns.source.map((source, i) => ({
+            source, target: linkColumns.target[i], label: linkColumns.label[i]
+        }));
 
         const width = window.innerWidth;
         const height = window.innerHeight;
@@ -202,9 +204,9 @@ def generate_d3_html(nodes: list[dict], edges: list[dict]) -> str:
         // Add zoom behavior
         const zoom = d3.zoom()
             .scaleExtent([0.1, 4])
-            .on("zoom", (event) => {{
+            .on("zoom", (event) => {
                 g.attr("transform", event.transform);
-            }});
+            });
 
         svg.call(zoom);
 
@@ -244,18 +246,18 @@ def generate_d3_html(nodes: list[dict], edges: list[dict]) -> str:
             .attr("r", 20)
             .attr("fill", d => getNodeColor(d.type))
             .call(drag(simulation))
-            .on("mouseover", function(event, d) {{
+            .on("mouseover", function(event, d) {
                 d3.select(this)
                     .transition()
                     .duration(200)
                     .attr("r", 25);
-            }})
-            .on("mouseout", function(event, d) {{
+            })
+            .on("mouseout", function(event, d) {
                 d3.select(this)
                     .transition()
                     .duration(200)
                     .attr("r", 20);
-            }});
+            });
 
         const label = g.append("g")
             .selectAll("text")
@@ -264,7 +266,7 @@ def generate_d3_html(nodes: list[dict], edges: list[dict]) -> str:
             .attr("class", "node-label")
             .text(d => d.label);
 
-        simulation.on("tick", () => {{
+        simulation.on("tick", () => {
             link
                 .attr("x1", d => d.source.x)
                 .attr("y1", d => d.source.y)
@@ -278,50 +280,50 @@ def generate_d3_html(nodes: list[dict], edges: list[dict]) -> str:
             label
                 .attr("x", d => d.x + 25)
                 .attr("y", d => d.y + 5);
-        }});
+        });
 
-        function getNodeColor(type) {{
-            const colors = {{
+        function getNodeColor(type) {
+            const colors = {
                 "Host": "#4CAF50",
                 "KVM": "#2196F3",
                 "AudioInterface": "#FF9800",
                 "SmartDisplay": "#9C27B0",
                 "PreAmp": "#F44336"
-            }};
+            };
             return colors[type] || "#999";
-        }}
+        }
 
-        function drag(simulation) {{
-            function dragstarted(event) {{
+        function drag(simulation) {
+            function dragstarted(event) {
                 if (!event.active) simulation.alphaTarget(0.3).restart();
                 event.subject.fx = event.subject.x;
                 event.subject.fy = event.subject.y;
-            }}
+            }
 
-            function dragged(event) {{
+            function dragged(event) {
                 event.subject.fx = event.x;
                 event.subject.fy = event.y;
-            }}
+            }
 
-            function dragended(event) {{
+            function dragended(event) {
                 if (!event.active) simulation.alphaTarget(0);
                 event.subject.fx = null;
                 event.subject.fy = null;
-            }}
+            }
 
             return d3.drag()
                 .on("start", dragstarted)
                 .on("drag", dragged)
                 .on("end", dragended);
-        }}
+        }
 
-        function resetZoom() {{
+        function resetZoom() {
             svg.transition()
                 .duration(750)
                 .call(zoom.transform, d3.zoomIdentity);
-        }}
+        }
 
-        function centerGraph() {{
+        function centerGraph() {
             const bounds = g.node().getBBox();
             const fullWidth = bounds.width;
             const fullHeight = bounds.height;
@@ -337,7 +339,7 @@ def generate_d3_html(nodes: list[dict], edges: list[dict]) -> str:
                     zoom.transform,
                     d3.zoomIdentity.translate(translate[0], translate[1]).scale(scale)
                 );
-        }}
+        }
 
         // Center on load
         setTimeout(centerGraph, 1000);
@@ -346,6 +348,48 @@ def generate_d3_html(nodes: list[dict], edges: list[dict]) -> str:
 </html>"""
 
 
+def _columns(records: list[dict], fields: tuple[str, ...]) -> dict[str, list]:
+    """Transpose uniform records into one list per field."""
+    return {field: [record[field] for record in records] for field in fields}
+
+
+def write_d3_html(nodes: list[dict], edges: list[dict], out: TextIO) -> None:
+    """
+    Write HTML with D3.js visualization to a text stream.
+
+    The node and link data are serialized straight into ``out`` between the
+    template chunks, so the page is never assembled as one string. They are
+    embedded as one array per field, so each key is written once rather than
+    once per record; the page rebuilds the records before laying them out.
+
+    Args:
+        nodes: List of node dictionaries
+        edges: List of edge dictionaries
+        out: Writable text stream
+    """
+    out.write(_HTML_HEAD)
+    json.dump(_columns(nodes, _NODE_FIELDS), out)
+    out.write(_HTML_LINKS)
+    json.dump(_columns(edges, _LINK_FIELDS), out)
+    out.write(_HTML_TAIL)
+
+
+def generate_d3_html(nodes: list[dict], edges: list[dict]) -> str:
+    """
+    Generate HTML with D3.js visualization.
+
+    Args:
+        nodes: List of node dictionaries
+        edges: List of edge dictionaries
+
+    Returns:
+        HTML string with embedded D3.js visualization
+    """
+    buffer = StringIO()
+    write_d3_html(nodes, edges, buffer)
+    return buffer.getvalue()
+
+
 def generate_visualization(ontology_path: Path, data_path: Path, output_path: Path) -> None:
     """
     Generate D3.js interactive visualization of topology.
@@ -355,19 +399,18 @@ def generate_visualization(ontology_path: Path, data_path: Path, output_path: Pa
         data_path: Path to deployment data
         output_path: Path to output HTML file
     """
-    # Load graphs
-    graph = Graph()
-    graph.parse(ontology_path, format="turtle")
-    graph.parse(data_path, format="turtle")
+    # Load the deployment data, plus only the ontology's class hierarchy:
+    # that is all device classification reads from it
+    graph = Graph(store="Oxigraph")
+    graph.parse(data_path, format="ox-turtle")
+    graph.addN((s, p, o, graph) for s, p, o in iter_turtle(ontology_path, (RDFS.subClassOf,)))
 
     # Extract nodes and edges
     nodes, edges = extract_topology_graph(graph)
 
     # Generate HTML
-    html = generate_d3_html(nodes, edges)
-
     with open(output_path, "w") as f:
-        f.write(html)
+        write_d3_html(nodes, edges, f)
 
     print(f"✅ Visualization generated: {output_path}")
     print(f"   Nodes: {len(nodes)}")
@@ -0,0 +1,49 @@
+"""Shared fixtures for the test suite."""
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from rdflib import Graph
+
+from nkllon.validate import load_graph
+
+
+@pytest.fixture(scope="session")
+def project_root() -> Path:
+    """Get project root directory."""
+    return Path(__file__).parent.parent
+
+
+@pytest.fixture(scope="session")
+def ontology_path(project_root: Path) -> Path:
+    """Get ontology file path."""
+    return project_root / "ontology" / "hardware_ontology.ttl"
+
+
+@pytest.fixture(scope="session")
+def shacl_path(project_root: Path) -> Path:
+    """Get SHACL constraints file path."""
+    return project_root / "ontology" / "system_constraints.shacl.ttl"
+
+
+@pytest.fixture(scope="session")
+def data_path(project_root: Path) -> Path:
+    """Get deployment data file path."""
+    return project_root / "data" / "physical_deployment.ttl"
+
+
+@pytest.fixture(scope="session")
+def graphs(ontology_path: Path, data_path: Path) -> SimpleNamespace:
+    """
+    Parse the ontology and deployment data once for the whole session.
+
+    Provides ``ontology``, ``data`` and ``merged`` (data plus ontology) graphs.
+    They are shared between tests, so tests must not modify them.
+    """
+    ontology = load_graph(ontology_path)
+    data = load_graph(data_path)
+    merged = Graph()
+    merged += data
+    merged += ontology
+    return SimpleNamespace(ontology=ontology, data=data, merged=merged)
@@ -0,0 +1,92 @@
+"""Tests for topology comparison."""
+
+from pathlib import Path
+
+import pytest
+from rdflib import RDF
+from rdflib.compare import graph_diff, to_isomorphic
+
+from nkllon.diff import _load_topology, _quick_hash, compare_topologies
+from nkllon.terms import NS
+
+PREFIX = "@prefix : <http://nkllon.com/sys#> .\n"
+
+LEAF_PORT_B = PREFIX + ':A :hasPort [ :physicalForm "USB-C" ] .\n:B a :Host .\n'
+LEAF_PORT_C = PREFIX + ':A :hasPort [ :physicalForm "USB-C" ] .\n:C a :Host .\n'
+TWO_PORTS_B = PREFIX + (
+    ':A :hasPort [ :physicalForm "USB-C" ; :id 1 ] , [ :physicalForm "HDMI" ] .\n:B a :Host .\n'
+)
+TWO_PORTS_C = PREFIX + (
+    ':A :hasPort [ :physicalForm "HDMI" ] , [ :physicalForm "USB-C" ; :id 2 ] .\n:C a :Host .\n'
+)
+NESTED_B = PREFIX + ':A :hasPort [ :connectsVia [ :label "HDMI" ] ] .\n:B a :Host .\n'
+NESTED_C = PREFIX + ':A :hasPort [ :connectsVia [ :label "HDMI" ] ] .\n:C a :Host .\n'
+TWIN_PORTS_B = PREFIX + ':A :hasPort [ :physicalForm "HDMI" ] , [ :physicalForm "HDMI" ] .\n'
+TWIN_PORTS_C = TWIN_PORTS_B + ":C a :Host .\n"
+
+
+def _write_pair(tmp_path: Path, first: str, second: str) -> tuple[Path, Path]:
+    """Write two topology documents and return their paths."""
+    path1 = tmp_path / "first.ttl"
+    path2 = tmp_path / "second.ttl"
+    path1.write_text(first)
+    path2.write_text(second)
+    return path1, path2
+
+
+def test_leaf_blank_nodes_match_across_files(tmp_path: Path) -> None:
+    """Test that identical leaf blank nodes count as shared despite different labels."""
+    path1, path2 = _write_pair(tmp_path, LEAF_PORT_B, LEAF_PORT_C)
+    assert _quick_hash(_load_topology(path1)) is not None
+
+    in_both, only_in_first, only_in_second = compare_topologies(path1, path2)
+
+    assert len(in_both) == 2
+    assert only_in_first == {(NS.B, RDF.type, NS.Host)}
+    assert only_in_second == {(NS.C, RDF.type, NS.Host)}
+    assert any(str(triple[2]) == "USB-C" for triple in in_both)
+
+
+def test_nested_blank_nodes_fall_back_to_canonicalization(tmp_path: Path) -> None:
+    """Test that a blank node pointing at another blank node still diffs correctly."""
+    path1, path2 = _write_pair(tmp_path, NESTED_B, NESTED_C)
+    assert _quick_hash(_load_topology(path1)) is None
+
+    in_both, only_in_first, only_in_second = compare_topologies(path1, path2)
+
+    assert len(in_both) == 3
+    assert only_in_first == {(NS.B, RDF.type, NS.Host)}
+    assert only_in_second == {(NS.C, RDF.type, NS.Host)}
+
+
+def test_indistinguishable_blank_nodes_fall_back_to_canonicalization(tmp_path: Path) -> None:
+    """Test that two blank nodes with the same description are not collapsed."""
+    path1, path2 = _write_pair(tmp_path, TWIN_PORTS_B, TWIN_PORTS_C)
+    assert _quick_hash(_load_topology(path1)) is None
+
+    in_both, only_in_first, only_in_second = compare_topologies(path1, path2)
+
+    assert len(in_both) == 4
+    assert only_in_first == set()
+    assert only_in_second == {(NS.C, RDF.type, NS.Host)}
+
+
+@pytest.mark.parametrize(
+    ("first", "second"),
+    [
+        (LEAF_PORT_B, LEAF_PORT_C),
+        (TWO_PORTS_B, TWO_PORTS_C),
+        (NESTED_B, NESTED_C),
+        (TWIN_PORTS_B, TWIN_PORTS_C),
+    ],
+)
+def test_compare_topologies_agrees_with_graph_diff(tmp_path: Path, first: str, second: str) -> None:
+    """Test that the diff sizes match rdflib's canonicalizing graph_diff."""
+    path1, path2 = _write_pair(tmp_path, first, second)
+    expected = graph_diff(
+        to_isomorphic(_load_topology(path1)), to_isomorphic(_load_topology(path2))
+    )
+
+    result = compare_topologies(path1, path2)
+
+    assert [len(part) for part in result] == [len(part) for part in expected]
@@ -1,36 +1,19 @@
 """Tests for SHACL validation."""
 
+import argparse
 from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
+from rdflib import OWL, RDF, Literal, plugin
+from rdflib.plugins.sparql.processor import SPARQLProcessor
+from rdflib.query import Processor
 
+from nkllon.cli import handle_validate
+from nkllon.terms import NS
 from nkllon.validate import load_graph, validate_topology
 
 
-@pytest.fixture
-def project_root() -> Path:
-    """Get project root directory."""
-    return Path(__file__).parent.parent
-
-
-@pytest.fixture
-def ontology_path(project_root: Path) -> Path:
-    """Get ontology file path."""
-    return project_root / "ontology" / "hardware_ontology.ttl"
-
-
-@pytest.fixture
-def shacl_path(project_root: Path) -> Path:
-    """Get SHACL constraints file path."""
-    return project_root / "ontology" / "system_constraints.shacl.ttl"
-
-
-@pytest.fixture
-def data_path(project_root: Path) -> Path:
-    """Get deployment data file path."""
-    return project_root / "data" / "physical_deployment.ttl"
-
-
 def test_load_ontology(ontology_path: Path) -> None:
     """Test that ontology file loads successfully."""
     graph = load_graph(ontology_path)
@@ -55,167 +38,345 @@ def test_validation_passes(
     data_path: Path,
 ) -> None:
     """Test that current deployment passes all SHACL constraints."""
-    conforms, report = validate_topology(ontology_path, shacl_path, data_path)
+    conforms, report = validate_topology(ontology_path, shacl_path, data_path, fast=True)
     assert conforms, f"Validation should pass. Report:\n{report}"
 
 
-def test_ontology_has_belongs_to_device(ontology_path: Path) -> None:
+def test_ontology_has_belongs_to_device(graphs: SimpleNamespace) -> None:
     """Test that belongsToDevice property is defined in ontology."""
-    graph = load_graph(ontology_path)
+    graph = graphs.ontology
 
-    query = """
-        PREFIX : <http://nkllon.com/sys#>
-        PREFIX owl: <http://www.w3.org/2002/07/owl#>
+    assert (NS.belongsToDevice, RDF.type, OWL.ObjectProperty) in graph, (
+        "belongsToDevice property should be defined"
+    )
 
-        ASK {
-            :belongsToDevice a owl:ObjectProperty .
-        }
-    """
 
-    result = graph.query(query)
-    assert bool(result), "belongsToDevice property should be defined"
+def test_audio_chain_connects_to_port(graphs: SimpleNamespace) -> None:
+    """Test that audio cable connects to a port, not directly to a device."""
+    graph = graphs.data
 
+    assert any(
+        (target, RDF.type, NS.Port) in graph
+        for port in graph.objects(NS.MotuM4, NS.hasPort)
+        for cable in graph.objects(port, NS.connectsVia)
+        for target in graph.objects(cable, NS.connectsTo)
+    ), "Audio cable should connect to a Port"
 
-def test_audio_chain_connects_to_port(data_path: Path) -> None:
-    """Test that audio cable connects to a port, not directly to a device."""
-    graph = load_graph(data_path)
 
-    query = """
-        PREFIX : <http://nkllon.com/sys#>
+def test_mac_m4_has_bidirectional_cable(graphs: SimpleNamespace) -> None:
+    """Test that Mac M4 uses bidirectional cable."""
+    graph = graphs.merged
 
-        SELECT ?cable ?target WHERE {
-            :MotuM4 :hasPort ?port .
-            ?port :connectsVia ?cable .
-            ?cable :connectsTo ?target .
-            ?target a :Port .
-        }
-    """
+    bidirectional = Literal(True)
+    assert any(
+        (cable, NS.isBidirectional, bidirectional) in graph
+        for port in graph.objects(NS.MacM4Mini, NS.hasPort)
+        for cable in graph.objects(port, NS.connectsVia)
+    ), "Mac M4 should have bidirectional cable"
 
-    results = list(graph.query(query))
-    assert len(results) > 0, "Audio cable should connect to a Port"
 
+def test_ubuntu_connects_to_high_priority_port(graphs: SimpleNamespace) -> None:
+    """Test that Ubuntu production host connects to high-priority KVM port."""
+    graph = graphs.merged
 
-def test_mac_m4_has_bidirectional_cable(data_path: Path, ontology_path: Path) -> None:
-    """Test that Mac M4 uses bidirectional cable."""
-    graph = load_graph(data_path)
-    graph += load_graph(ontology_path)
+    high_priority = Literal("High-Priority")
+    assert any(
+        (kvm_port, NS.portPriority, high_priority) in graph
+        for port in graph.objects(NS.Ubuntu_Prod, NS.hasPort)
+        for cable in graph.objects(port, NS.connectsVia)
+        for kvm_port in graph.objects(cable, NS.connectsTo)
+    ), "Ubuntu should connect to high-priority port"
 
-    query = """
-        PREFIX : <http://nkllon.com/sys#>
 
-        SELECT ?cable WHERE {
-            :MacM4Mini :hasPort ?port .
-            ?port :connectsVia ?cable .
-            ?cable :isBidirectional true .
-        }
-    """
+def test_smart_display_exists(graphs: SimpleNamespace) -> None:
+    """Test that SmartDisplay device class exists and is used."""
+    graph = graphs.merged
 
-    results = list(graph.query(query))
-    assert len(results) > 0, "Mac M4 should have bidirectional cable"
+    assert any(graph.subjects(RDF.type, NS.SmartDisplay)), "SmartDisplay device should exist"
 
 
-def test_ubuntu_connects_to_high_priority_port(
-    data_path: Path,
-    ontology_path: Path,
-) -> None:
-    """Test that Ubuntu production host connects to high-priority KVM port."""
-    graph = load_graph(data_path)
-    graph += load_graph(ontology_path)
+def test_preamp_exists(graphs: SimpleNamespace) -> None:
+    """Test that PreAmp device class exists and is used."""
+    graph = graphs.merged
 
-    query = """
-        PREFIX : <http://nkllon.com/sys#>
+    assert any(graph.subjects(RDF.type, NS.PreAmp)), "PreAmp device should exist"
 
-        SELECT ?kvmPort WHERE {
-            :Ubuntu_Prod :hasPort ?port .
-            ?port :connectsVia ?cable .
-            ?cable :connectsTo ?kvmPort .
-            ?kvmPort :portPriority "High-Priority" .
-        }
-    """
 
-    results = list(graph.query(query))
-    assert len(results) > 0, "Ubuntu should connect to high-priority port"
+def test_earc_connection_exists(graphs: SimpleNamespace) -> None:
+    """Test that eARC connection from SmartDisplay to PreAmp exists."""
+    graph = graphs.merged
 
+    assert any(
+        (preamp, RDF.type, NS.PreAmp) in graph
+        for display in graph.subjects(RDF.type, NS.SmartDisplay)
+        for port in graph.objects(display, NS.hasPort)
+        for cable in graph.objects(port, NS.connectsVia)
+        for preamp_port in graph.objects(cable, NS.connectsTo)
+        for preamp in graph.objects(preamp_port, NS.belongsToDevice)
+    ), "eARC connection from SmartDisplay to PreAmp should exist"
 
-def test_smart_display_exists(data_path: Path, ontology_path: Path) -> None:
-    """Test that SmartDisplay device class exists and is used."""
-    graph = load_graph(data_path)
-    graph += load_graph(ontology_path)
 
-    query = """
-        PREFIX : <http://nkllon.com/sys#>
+def test_audio_interface_connects_to_preamp(graphs: SimpleNamespace) -> None:
+    """Test that audio interface can connect to PreAmp."""
+    graph = graphs.merged
 
-        SELECT ?display WHERE {
-            ?display a :SmartDisplay .
-        }
-    """
+    assert any(
+        (preamp, RDF.type, NS.PreAmp) in graph
+        for audio in graph.subjects(RDF.type, NS.AudioInterface)
+        for port in graph.objects(audio, NS.hasPort)
+        for cable in graph.objects(port, NS.connectsVia)
+        for preamp_port in graph.objects(cable, NS.connectsTo)
+        for preamp in graph.objects(preamp_port, NS.belongsToDevice)
+    ), "Audio interface should connect to PreAmp"
 
-    results = list(graph.query(query))
-    assert len(results) > 0, "SmartDisplay device should exist"
 
+def test_load_graph_returns_independent_copies(ontology_path: Path) -> None:
+    """Test that mutating a loaded graph does not affect later loads."""
+    first = load_graph(ontology_path)
+    expected = len(first)
+    first += load_graph(ontology_path.parent.parent / "data" / "physical_deployment.ttl")
 
-def test_preamp_exists(data_path: Path, ontology_path: Path) -> None:
-    """Test that PreAmp device class exists and is used."""
-    graph = load_graph(data_path)
-    graph += load_graph(ontology_path)
+    assert len(load_graph(ontology_path)) == expected
 
-    query = """
-        PREFIX : <http://nkllon.com/sys#>
 
-        SELECT ?preamp WHERE {
-            ?preamp a :PreAmp .
-        }
-    """
+def test_load_graph_reparses_modified_file(tmp_path: Path) -> None:
+    """Test that the graph cache is invalidated when the file changes."""
+    ttl = tmp_path / "sample.ttl"
+    ttl.write_text("@prefix : <http://nkllon.com/sys#> .\n:A a :Device .\n")
+    assert len(load_graph(ttl)) == 1
 
-    results = list(graph.query(query))
-    assert len(results) > 0, "PreAmp device should exist"
+    ttl.write_text("@prefix : <http://nkllon.com/sys#> .\n:A a :Device .\n:B a :Device .\n")
+    assert len(load_graph(ttl)) == 2
 
 
-def test_earc_connection_exists(
-    data_path: Path,
+def test_load_graph_scopes_blank_nodes_per_file(tmp_path: Path) -> None:
+    """Test that files reusing a blank node label do not share that node when merged."""
+    first = tmp_path / "first.ttl"
+    second = tmp_path / "second.ttl"
+    first.write_text('@prefix : <http://nkllon.com/sys#> .\n_:p1 a :Port ; :label "first" .\n')
+    second.write_text('@prefix : <http://nkllon.com/sys#> .\n_:p1 a :Port ; :label "second" .\n')
+
+    merged = load_graph(first)
+    merged += load_graph(second)
+
+    assert len(set(merged.subjects(RDF.type, NS.Port))) == 2
+
+
+def test_validation_passes_without_inference(
     ontology_path: Path,
+    shacl_path: Path,
+    data_path: Path,
 ) -> None:
-    """Test that eARC connection from SmartDisplay to PreAmp exists."""
-    graph = load_graph(data_path)
-    graph += load_graph(ontology_path)
+    """Test that the constraints hold on asserted triples alone, without RDFS inference."""
+    conforms, report = validate_topology(
+        ontology_path, shacl_path, data_path, inference="none", advanced=False
+    )
+    assert conforms, f"Validation should pass without inference. Report:\n{report}"
 
-    query = """
-        PREFIX : <http://nkllon.com/sys#>
 
-        SELECT ?display ?preamp WHERE {
-            ?display a :SmartDisplay ;
-                     :hasPort ?port .
-            ?port :connectsVia ?cable .
-            ?cable :connectsTo ?preampPort .
-            ?preampPort :belongsToDevice ?preamp .
-            ?preamp a :PreAmp .
-        }
-    """
+def test_validation_recomputes_closure_after_data_edit(
+    ontology_path: Path,
+    shacl_path: Path,
+    data_path: Path,
+    tmp_path: Path,
+) -> None:
+    """Test that editing the data file invalidates the cached RDFS closure."""
+    data = tmp_path / "deployment.ttl"
+    data.write_text(data_path.read_text())
+    conforms, _ = validate_topology(ontology_path, shacl_path, data)
+    assert conforms
 
-    results = list(graph.query(query))
-    assert len(results) > 0, "eARC connection from SmartDisplay to PreAmp should exist"
+    data.write_text(
+        data_path.read_text().replace(":isBidirectional true", ":isBidirectional false")
+    )
+    conforms, report = validate_topology(ontology_path, shacl_path, data)
+    assert not conforms, "Validation should see the edited data"
+    assert "Focus Node: :Cable_A" in report
 
 
-def test_audio_interface_connects_to_preamp(
+def test_validation_restores_sparql_processor(
+    ontology_path: Path,
+    shacl_path: Path,
     data_path: Path,
+) -> None:
+    """Test that the caching SPARQL processor is only installed during validation."""
+    assert plugin.get("sparql", Processor) is SPARQLProcessor
+    validate_topology(ontology_path, shacl_path, data_path)
+    assert plugin.get("sparql", Processor) is SPARQLProcessor
+
+
+def test_handle_validate_returns_exit_code() -> None:
+    """Test that the validate handler reports success as an exit code instead of exiting."""
+    args = argparse.Namespace(
+        env="prod",
+        export=None,
+        format=None,
+        no_inference=False,
+        verbose=False,
+        quiet=True,
+    )
+    assert handle_validate(args) == 0
+
+
+def test_validation_leaves_cached_graphs_unmodified(
     ontology_path: Path,
+    shacl_path: Path,
+    data_path: Path,
 ) -> None:
-    """Test that audio interface can connect to PreAmp."""
-    graph = load_graph(data_path)
-    graph += load_graph(ontology_path)
-
-    query = """
-        PREFIX : <http://nkllon.com/sys#>
-
-        SELECT ?audio ?preamp WHERE {
-            ?audio a :AudioInterface ;
-                   :hasPort ?port .
-            ?port :connectsVia ?cable .
-            ?cable :connectsTo ?preampPort .
-            ?preampPort :belongsToDevice ?preamp .
-            ?preamp a :PreAmp .
-        }
-    """
-
-    results = list(graph.query(query))
-    assert len(results) > 0, "Audio interface should connect to PreAmp"
+    """Test that validating against the shared cached graphs does not alter them."""
+    before = [len(load_graph(p)) for p in (ontology_path, data_path)]
+    validate_topology(ontology_path, shacl_path, data_path)
+    assert [len(load_graph(p)) for p in (ontology_path, data_path)] == before
+
+
+def _validate_with_backend(
+    monkeypatch: pytest.MonkeyPatch, backend: str, *paths: Path
+) -> tuple[bool, int, list[str]]:
+    """Validate with the given SHACL backend; return conforms, violation count and messages."""
+    monkeypatch.setenv("NKLLON_SHACL_BACKEND", backend)
+    conforms, report = validate_topology(*paths)
+    messages = sorted(line.strip() for line in report.splitlines() if "Message:" in line)
+    return conforms, report.count("Focus Node:"), messages
+
+
+@pytest.mark.parametrize(
+    ("old", "new"),
+    [
+        ("", ""),
+        (":isBidirectional true", ":isBidirectional false"),
+        ('"High-Priority"', '"Low-Priority"'),
+        (":connectsVia :HDMI_eARC_Cable", ":connectsVia :Unplugged"),
+    ],
+)
+def test_oxigraph_backend_matches_pyshacl(
+    ontology_path: Path,
+    shacl_path: Path,
+    data_path: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    old: str,
+    new: str,
+) -> None:
+    """Test that the oxigraph SHACL backend reaches the same verdicts as pyshacl."""
+    data = tmp_path / "deployment.ttl"
+    data.write_text(data_path.read_text().replace(old, new) if old else data_path.read_text())
+    paths = (ontology_path, shacl_path, data)
+
+    expected = _validate_with_backend(monkeypatch, "pyshacl", *paths)
+    assert _validate_with_backend(monkeypatch, "oxigraph", *paths) == expected
+
+
+UNIDIRECTIONAL_CABLES = """
+    sh:sparql [
+        sh:message "%s" ;
+        sh:select \"\"\"
+            PREFIX : <http://nkllon.com/sys#>
+            SELECT $this WHERE { FILTER NOT EXISTS { $this :isBidirectional true } }
+        \"\"\" ;
+    ] .
+"""
+
+
+@pytest.mark.parametrize(
+    "shape",
+    [
+        # Implicit class target: the shape is also the class it constrains
+        ":Cable a rdfs:Class, sh:NodeShape ;" + UNIDIRECTIONAL_CABLES % "Cable is one-way",
+        # Untyped shape: a node shape only by virtue of its target
+        ":CableShape sh:targetClass :Cable ;" + UNIDIRECTIONAL_CABLES % "Cable is one-way",
+        # Message template filled in with the focus node
+        ":CableShape a sh:NodeShape ; sh:targetClass :Cable ;"
+        + UNIDIRECTIONAL_CABLES % "Cable {$this} is one-way",
+    ],
+    ids=["implicit-class-target", "untyped-shape", "message-template"],
+)
+def test_oxigraph_backend_matches_pyshacl_on_shapes(
+    ontology_path: Path,
+    data_path: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    shape: str,
+) -> None:
+    """Test that shapes the oxigraph backend cannot run are still checked like pyshacl does."""
+    shapes = tmp_path / "cables.shacl.ttl"
+    shapes.write_text(
+        "@prefix sh: <http://www.w3.org/ns/shacl#> .\n"
+        "@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .\n"
+        "@prefix : <http://nkllon.com/sys#> .\n" + shape
+    )
+    data = tmp_path / "deployment.ttl"
+    data.write_text(
+        data_path.read_text().replace(":isBidirectional true", ":isBidirectional false")
+    )
+    paths = (ontology_path, shapes, data)
+
+    expected = _validate_with_backend(monkeypatch, "pyshacl", *paths)
+    assert not expected[0]
+    assert _validate_with_backend(monkeypatch, "oxigraph", *paths) == expected
+
+
+def test_oxigraph_backend_defers_other_prebound_variables(
+    ontology_path: Path,
+    data_path: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that queries using $currentShape and friends are left to pyshacl."""
+    shapes = tmp_path / "current_shape.shacl.ttl"
+    shapes.write_text(
+        """
+        @prefix sh: <http://www.w3.org/ns/shacl#> .
+        @prefix : <http://nkllon.com/sys#> .
+
+        :ShapeIsBound a sh:NodeShape ;
+            sh:targetClass :Cable ;
+            sh:sparql [
+                sh:message "$currentShape was not pre-bound" ;
+                sh:select \"\"\"
+                    SELECT $this WHERE { FILTER(!BOUND($currentShape)) }
+                \"\"\" ;
+            ] .
+        """
+    )
+    paths = (ontology_path, shapes, data_path)
+
+    expected = _validate_with_backend(monkeypatch, "pyshacl", *paths)
+    assert expected == (True, 0, [])
+    assert _validate_with_backend(monkeypatch, "oxigraph", *paths) == expected
+
+
+def test_advanced_features_enabled_for_rules(
+    ontology_path: Path,
+    data_path: Path,
+    tmp_path: Path,
+) -> None:
+    """Test that shapes using sh:rule get SHACL Advanced Features without asking."""
+    shapes = tmp_path / "rules.shacl.ttl"
+    shapes.write_text(
+        """
+        @prefix sh: <http://www.w3.org/ns/shacl#> .
+        @prefix : <http://nkllon.com/sys#> .
+
+        :CheckCables a sh:NodeShape ;
+            sh:targetClass :Cable ;
+            sh:rule [
+                a sh:TripleRule ;
+                sh:subject sh:this ;
+                sh:predicate :checked ;
+                sh:object true ;
+            ] .
+
+        :CablesChecked a sh:NodeShape ;
+            sh:targetClass :Cable ;
+            sh:sparql [
+                sh:message "Cable was not checked by the rule" ;
+                sh:select \"\"\"
+                    PREFIX : <http://nkllon.com/sys#>
+                    SELECT $this WHERE { FILTER NOT EXISTS { $this :checked true } }
+                \"\"\" ;
+            ] .
+        """
+    )
+
+    conforms, report = validate_topology(ontology_path, shapes, data_path)
+    assert conforms, f"Rule-derived triples should satisfy the constraint. Report:\n{report}"
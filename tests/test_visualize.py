@@ -0,0 +1,74 @@
+"""Tests for topology visualization."""
+
+import json
+import re
+from pathlib import Path
+from types import SimpleNamespace
+
+from nkllon.visualize import extract_topology_graph, generate_d3_html, generate_visualization
+
+EXPECTED_NODES = {
+    ("YamahaPreAmp", "PreAmp"),
+    ("SamsungOdyssey", "SmartDisplay"),
+    ("ConnectPRO_KVM", "KVM"),
+    ("MotuM4", "AudioInterface"),
+    ("Ubuntu_Prod", "Host"),
+    ("MacM4Mini", "Host"),
+}
+
+EXPECTED_EDGES = {
+    ("SamsungOdyssey", "YamahaPreAmp", "HDMI_eARC_Cable"),
+    ("MotuM4", "YamahaPreAmp", "Direct_USB"),
+    ("Ubuntu_Prod", "ConnectPRO_KVM", "Cable_B"),
+    ("MacM4Mini", "ConnectPRO_KVM", "Cable_A"),
+}
+
+
+def _embedded_columns(html: str, name: str) -> dict[str, list]:
+    """Return the column-wise JSON assigned to ``const <name>`` in the page."""
+    match = re.search(rf"const {name} = (.*);\n", html)
+    assert match, f"{name} should be embedded in the page"
+    columns: dict[str, list] = json.loads(match.group(1))
+    return columns
+
+
+def test_extract_topology_graph(graphs: SimpleNamespace) -> None:
+    """Test that devices and their cable connections are extracted from the deployment."""
+    nodes, edges = extract_topology_graph(graphs.merged)
+
+    assert len(nodes) == len(EXPECTED_NODES)
+    assert {(node["id"], node["type"]) for node in nodes} == EXPECTED_NODES
+    assert all(node["label"] == node["id"] for node in nodes)
+    assert len(edges) == len(EXPECTED_EDGES)
+    assert {(edge["source"], edge["target"], edge["label"]) for edge in edges} == EXPECTED_EDGES
+
+
+def test_generate_d3_html_embeds_columns(graphs: SimpleNamespace) -> None:
+    """Test that nodes and links are embedded as equal-length field arrays."""
+    nodes, edges = extract_topology_graph(graphs.merged)
+    html = generate_d3_html(nodes, edges)
+
+    node_columns = _embedded_columns(html, "nodeColumns")
+    link_columns = _embedded_columns(html, "linkColumns")
+
+    assert set(node_columns) == {"id", "type", "label"}
+    assert {len(column) for column in node_columns.values()} == {len(nodes)}
+    assert set(link_columns) == {"source", "target", "label"}
+    assert {len(column) for column in link_columns.values()} == {len(edges)}
+    assert set(zip(node_columns["id"], node_columns["type"])) == EXPECTED_NODES
+    assert set(zip(*link_columns.values())) == EXPECTED_EDGES
+
+
+def test_generate_visualization_writes_page(
+    ontology_path: Path, data_path: Path, tmp_path: Path
+) -> None:
+    """Test that the page written from the topology files holds every device and link."""
+    output = tmp_path / "topology.html"
+    generate_visualization(ontology_path, data_path, output)
+
+    html = output.read_text()
+    node_columns = _embedded_columns(html, "nodeColumns")
+    link_columns = _embedded_columns(html, "linkColumns")
+
+    assert set(zip(node_columns["id"], node_columns["type"])) == EXPECTED_NODES
+    assert set(zip(*link_columns.values())) == EXPECTED_EDGES